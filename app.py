@@ -1,15 +1,16 @@
 import streamlit as st
 import pandas as pd
-import joblib
+import numpy as np
+import pyarrow.parquet as pq
+import streamlit.components.v1 as components
 import folium
-from streamlit_folium import st_folium # Ensure this is st_folium, not folium_static
-from shapely import wkt
+import shapely
 import os
 
 # --- Configuration & Constants ---
-MODEL_PATH = "traffic_speed_model.pkl"
-ENCODER_PATH = "segment_encoder.pkl"
+LOOKUP_PATH = "traffic_speed_lookup.npz"
 SEGMENTS_CSV_PATH = "warsaw_road_segments.csv"
+SEGMENTS_PARQUET_PATH = "warsaw_road_segments.parquet"
 
 st.set_page_config(page_title="Warsaw Traffic Predictor & Map", layout="wide", initial_sidebar_state="expanded")
 
@@ -29,25 +30,39 @@ with header_col2:
 
 # --- Loading Data and Models (with caching) ---
 @st.cache_resource
-def load_model_and_encoder():
-    if not os.path.exists(MODEL_PATH) or not os.path.exists(ENCODER_PATH):
-        st.error(f"Model ('{MODEL_PATH}') or encoder ('{ENCODER_PATH}') not found. Please run the training script first.")
+def load_speed_lookup():
+    if not os.path.exists(LOOKUP_PATH):
+        st.error(f"Speed lookup table ('{LOOKUP_PATH}') not found. Please run the training script first.")
         return None, None
     try:
-        model = joblib.load(MODEL_PATH)
-        segment_encoder = joblib.load(ENCODER_PATH)
-        return model, segment_encoder
+        with np.load(LOOKUP_PATH) as lookup:
+            # table[i, hour] is the speed of segment classes[i]; classes is sorted
+            return lookup["table"], lookup["classes"]
     except Exception as e:
-        st.error(f"Error loading model/encoder: {e}")
+        st.error(f"Error loading speed lookup table: {e}")
         return None, None
 
 @st.cache_data
 def load_segment_data():
-    if not os.path.exists(SEGMENTS_CSV_PATH):
-        st.error(f"Road segments file ('{SEGMENTS_CSV_PATH}') not found. Please run 'extract_segments.py'.")
+    if not os.path.exists(SEGMENTS_PARQUET_PATH) and not os.path.exists(SEGMENTS_CSV_PATH):
+        st.error(f"Road segments file ('{SEGMENTS_PARQUET_PATH}' or '{SEGMENTS_CSV_PATH}') not found. Please run 'extract_segments.py'.")
         return pd.DataFrame()
     try:
-        segments_df = pd.read_csv(SEGMENTS_CSV_PATH)
+        # Prefer the Parquet file (WKB geometry), fall back to the CSV (WKT geometry)
+        from_parquet = os.path.exists(SEGMENTS_PARQUET_PATH)
+        if from_parquet:
+            # Only read the columns used below, checking the schema first as the CSV path checks its header
+            parquet_columns = pq.read_schema(SEGMENTS_PARQUET_PATH).names
+            # Display the pre-simplified geometry when extract_segments.py produced one
+            geometry_column = "geometry_simplified" if "geometry_simplified" in parquet_columns else "geometry"
+            segment_columns = [c for c in ["segment_id", "name", geometry_column, "u", "v"] if c in parquet_columns]
+            segments_df = pd.read_parquet(SEGMENTS_PARQUET_PATH, columns=segment_columns)
+        else:
+            # Only read the columns used below (the 'u'/'v' fallback included), with pyarrow's multi-threaded parser
+            csv_header = pd.read_csv(SEGMENTS_CSV_PATH, nrows=0).columns
+            geometry_column = "geometry_simplified" if "geometry_simplified" in csv_header else "geometry"
+            segment_columns = [c for c in ["segment_id", "name", geometry_column, "u", "v"] if c in csv_header]
+            segments_df = pd.read_csv(SEGMENTS_CSV_PATH, engine="pyarrow", usecols=segment_columns, dtype_backend="pyarrow")
         if "segment_id" not in segments_df.columns:
             if 'u' in segments_df.columns and 'v' in segments_df.columns:
                 segments_df["segment_id"] = segments_df["u"].astype(str) + "_" + segments_df["v"].astype(str)
@@ -55,21 +70,71 @@ def load_segment_data():
                 st.error("Cannot create 'segment_id'. 'u' and 'v' columns are missing.")
                 return pd.DataFrame()
         
-        # Converting WKT geometry to Shapely objects
-        segments_df["geometry_obj"] = segments_df["geometry"].apply(wkt.loads)
+        # Arrow-backed strings are compact and filter/de-duplicate in C
+        for column in ["segment_id", "name"]:
+            segments_df[column] = segments_df[column].astype("string[pyarrow]")
+        
+        # Filter and de-duplicate on the plain string columns before touching geometries
+        named_segments = segments_df[segments_df["name"].notna()].drop_duplicates(subset=["segment_id"])
+        
+        # Keep geometries as WKB bytes: st.cache_data copies the frame on every access, and bytes copy
+        # far faster than Shapely objects. Only the selected segment is decoded, in the map view.
+        named_segments = named_segments.copy()
+        if from_parquet:
+            named_segments["geometry_wkb"] = named_segments[geometry_column]
+        else:
+            named_segments["geometry_wkb"] = shapely.to_wkb(shapely.from_wkt(named_segments[geometry_column].to_numpy()))
         
-        named_segments = segments_df[segments_df["name"].notna()].copy()
         named_segments.loc[:, "display_name"] = named_segments["name"] + " (" + named_segments["segment_id"] + ")"
-        return named_segments[["segment_id", "name", "display_name", "geometry_obj"]].drop_duplicates(subset=["segment_id"]).sort_values(by="name")
+        return named_segments[["segment_id", "name", "display_name", "geometry_wkb"]].sort_values(by="name")
     except Exception as e:
         st.error(f"Error loading or processing segment data: {e}")
         return pd.DataFrame()
 
-model, segment_encoder = load_model_and_encoder()
+# --- Map Rendering (with caching) ---
+def get_color(speed):
+    if speed < 15:
+        return "red"
+    elif speed < 30:
+        return "orange"
+    else:
+        return "green"
+
+@st.cache_data
+def build_map_html(geometry_wkb, display_name, hour, speed):
+    # Cached per (segment geometry, hour, speed): reruns with the same prediction skip the Folium render
+    segment_geometry = shapely.from_wkb(geometry_wkb)
+    
+    # Ensure coords are in (lat, lon) for Folium
+    if segment_geometry.geom_type == 'LineString':
+        coords = [(lat, lon) for lon, lat in segment_geometry.coords]
+    elif segment_geometry.geom_type == 'MultiLineString': # Handle MultiLineString if present
+        all_coords = []
+        for line in segment_geometry.geoms:
+            all_coords.extend([(lat, lon) for lon, lat in line.coords])
+        coords = all_coords # Folium PolyLine can take a list of lists for MultiLineString parts
+    else:
+        st.error(f"Unsupported geometry type: {segment_geometry.geom_type}")
+        return None
+    if not coords:
+        return None
+
+    center_latlon = coords[len(coords)//2]
+    m = folium.Map(location=center_latlon, zoom_start=15, tiles="cartodbpositron")
+    folium.PolyLine(
+        locations=coords,
+        color=get_color(speed),
+        weight=7,
+        opacity=0.8,
+        tooltip=f"{display_name}<br>Hour: {hour:02d}:00<br>Speed: {speed:.1f} km/h"
+    ).add_to(m)
+    return m.get_root().render()
+
+speed_table, segment_classes = load_speed_lookup()
 segments_with_geo = load_segment_data()
 
 # --- Streamlit UI ---
-if model is None or segment_encoder is None or segments_with_geo.empty:
+if speed_table is None or segment_classes is None or segments_with_geo.empty:
     st.warning("Application cannot start due to missing data or model. Please check error messages above.")
 else:
     col1, col2 = st.columns([1, 2]) # Sidebar-like column for inputs, main column for map/results
@@ -89,12 +154,12 @@ else:
         if st.button("🔮 Predict and Show on Map", type="primary"):
             if selected_segment_id:
                 try:
-                    if selected_segment_id not in segment_encoder.classes_:
+                    # Bisect the sorted ids once; a miss lands on a different id (or past the end)
+                    segment_idx = np.searchsorted(segment_classes, selected_segment_id)
+                    if segment_idx == len(segment_classes) or segment_classes[segment_idx] != selected_segment_id:
                         st.error(f"Segment ID '{selected_segment_id}' was not seen during model training. Cannot make a prediction.")
                     else:
-                        segment_encoded_val = segment_encoder.transform([selected_segment_id])[0]
-                        input_features = [[segment_encoded_val, hour]]
-                        predicted_speed = model.predict(input_features)[0]
+                        predicted_speed = float(speed_table[segment_idx, hour])
                         
                         st.metric(label=f"Predicted Speed for '{selected_display_name}' at {hour:02d}:00", 
                                   value=f"{predicted_speed:.1f} km/h")
@@ -121,7 +186,7 @@ else:
 
         st.markdown("---")
         st.subheader("About the Data")
-        st.markdown("Model trained on simulated Warsaw traffic. Road data from OpenStreetMap.")
+        st.markdown("Predictions use per-segment hourly speeds built from simulated Warsaw traffic. Road data from OpenStreetMap.")
         if st.checkbox("Show sample of available road segments (first 10)"):
             st.dataframe(segments_with_geo[['name', 'segment_id']].head(10))
 
@@ -134,41 +199,11 @@ else:
             current_hour = st.session_state.hour
 
             segment_row = segments_with_geo[segments_with_geo["segment_id"] == current_segment_id].iloc[0]
-            segment_geometry = segment_row["geometry_obj"]
-            
-            # Ensure coords are in (lat, lon) for Folium
-            if segment_geometry.geom_type == 'LineString':
-                coords = [(lat, lon) for lon, lat in segment_geometry.coords]
-            elif segment_geometry.geom_type == 'MultiLineString': # Handle MultiLineString if present
-                all_coords = []
-                for line in segment_geometry.geoms:
-                    all_coords.extend([(lat, lon) for lon, lat in line.coords])
-                coords = all_coords # Folium PolyLine can take a list of lists for MultiLineString parts
-            else:
-                st.error(f"Unsupported geometry type: {segment_geometry.geom_type}")
-                coords = []
-
-            def get_color(speed):
-                if speed < 15:
-                    return "red"
-                elif speed < 30:
-                    return "orange"
-                else:
-                    return "green"
-
-            if coords:
-                center_latlon = coords[len(coords)//2]
-                m = folium.Map(location=center_latlon, zoom_start=15, tiles="cartodbpositron")
-                folium.PolyLine(
-                    locations=coords,
-                    color=get_color(current_speed),
-                    weight=7,
-                    opacity=0.8,
-                    tooltip=f"{current_display_name}<br>Hour: {current_hour:02d}:00<br>Speed: {current_speed:.1f} km/h"
-                ).add_to(m)
-                
+            map_html = build_map_html(segment_row["geometry_wkb"], current_display_name, current_hour, round(float(current_speed), 1))
+
+            if map_html:
                 # Display map
-                st_folium(m, width=700, height=500, key=f"map_{current_segment_id}_{current_hour}") # Add key to force rerender
+                components.html(map_html, width=700, height=500)
             else:
                 st.write("No coordinates to display for this segment.")
         else:
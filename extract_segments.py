@@ -1,32 +1,61 @@
 import osmnx as ox
 import pandas as pd
+import geopandas as gpd
+import numpy as np
+import shapely
 import os
 import time
 
 try:
     # Define file paths
     graph_filepath = 'warsaw_graph.graphml'
+    nodes_filepath = 'warsaw_nodes.parquet'
+    edges_filepath = 'warsaw_edges.parquet'
     segments_filepath = 'warsaw_road_segments.csv'
+    segments_parquet_filepath = 'warsaw_road_segments.parquet'
     named_segments_filepath = 'warsaw_named_road_segments.csv'
     
     start_time = time.time()
     
-    # Check if the saved graph exists, otherwise download it
-    if os.path.exists(graph_filepath):
-        print(f"Loading graph from {graph_filepath}...")
-        G = ox.load_graphml(graph_filepath)
+    # Load the saved nodes/edges if they exist and are not older than the saved graph;
+    # otherwise load (or download) the graph and convert it
+    parquet_is_current = os.path.exists(nodes_filepath) and os.path.exists(edges_filepath) and (
+        not os.path.exists(graph_filepath)
+        or min(os.path.getmtime(nodes_filepath), os.path.getmtime(edges_filepath)) >= os.path.getmtime(graph_filepath)
+    )
+    if parquet_is_current:
+        print(f"Loading nodes and edges from {nodes_filepath} and {edges_filepath}...")
+        gdf_nodes = gpd.read_parquet(nodes_filepath)
+        gdf_edges = gpd.read_parquet(edges_filepath)
     else:
-        print(f"Downloading road network for Warsaw, Poland...")
-        city = "Warsaw, Poland"
-        G = ox.graph_from_place(city, network_type='drive')
+        # Check if the saved graph exists, otherwise download it
+        if os.path.exists(graph_filepath):
+            print(f"Loading graph from {graph_filepath}...")
+            G = ox.load_graphml(graph_filepath)
+        else:
+            print(f"Downloading road network for Warsaw, Poland...")
+            city = "Warsaw, Poland"
+            G = ox.graph_from_place(city, network_type='drive')
+            
+            # Save the graph to disk for future use
+            print(f"Saving graph to {graph_filepath}...")
+            ox.save_graphml(G, graph_filepath)
         
-        # Save the graph to disk for future use
-        print(f"Saving graph to {graph_filepath}...")
-        ox.save_graphml(G, graph_filepath)
+        # Convert the graph into a GeoDataFrame of edges (i.e., road segments)
+        print("Converting graph to GeoDataFrame...")
+        gdf_nodes, gdf_edges = ox.graph_to_gdfs(G)
+        
+        # OSM attributes mix scalars and lists (merged ways); store them as strings so Parquet gets a single type per column
+        for gdf in (gdf_nodes, gdf_edges):
+            for column in gdf.columns:
+                if column != gdf.geometry.name and gdf[column].dtype == object:
+                    gdf[column] = gdf[column].astype(str).where(gdf[column].notna(), None)
+        
+        # Save nodes and edges to Parquet so later runs skip GraphML parsing and conversion
+        print(f"Saving nodes and edges to {nodes_filepath} and {edges_filepath}...")
+        gdf_nodes.to_parquet(nodes_filepath)
+        gdf_edges.to_parquet(edges_filepath)
     
-    # Convert the graph into a GeoDataFrame of edges (i.e., road segments)
-    print("Converting graph to GeoDataFrame...")
-    gdf_nodes, gdf_edges = ox.graph_to_gdfs(G)
     print(f"Graph has {len(gdf_nodes)} nodes and {len(gdf_edges)} edges")
     
     # Print column names to debug
@@ -52,13 +81,23 @@ try:
     
     # Process the geometry to extract coordinates
     print("Processing coordinates...")
-    segments_df["start_lat"] = segments_df.geometry.apply(lambda g: g.coords[0][1])
-    segments_df["start_lon"] = segments_df.geometry.apply(lambda g: g.coords[0][0])
-    segments_df["end_lat"] = segments_df.geometry.apply(lambda g: g.coords[-1][1])
-    segments_df["end_lon"] = segments_df.geometry.apply(lambda g: g.coords[-1][0])
+    # Get all vertices in one call; idx maps each vertex to its geometry, so first/last vertices sit at idx boundaries
+    coords, idx = shapely.get_coordinates(segments_df.geometry.values, return_index=True)
+    first_mask = np.concatenate(([True], idx[1:] != idx[:-1]))
+    last_mask = np.concatenate((idx[1:] != idx[:-1], [True]))
+    segments_df["start_lat"] = coords[first_mask, 1]
+    segments_df["start_lon"] = coords[first_mask, 0]
+    segments_df["end_lat"] = coords[last_mask, 1]
+    segments_df["end_lon"] = coords[last_mask, 0]
     
-    # Create a unique segment ID
-    segments_df["segment_id"] = segments_df.index
+    # Precompute a simplified (Douglas-Peucker, ~5 m) geometry for map rendering; vertices below that are invisible at city zoom
+    segments_df["geometry_simplified"] = gpd.GeoSeries(
+        shapely.simplify(segments_df.geometry.values, tolerance=5e-5, preserve_topology=False),
+        index=segments_df.index, crs=segments_df.crs
+    )
+    
+    # Create a unique segment ID (string form of the (u, v, key) edge index)
+    segments_df["segment_id"] = segments_df.index.map(str)
     
     # Extract named roads (optional filter)
     named_segments_df = segments_df[segments_df["name"].notna()]
@@ -72,6 +111,10 @@ try:
     print(f"Saving all road segments to {segments_filepath}...")
     segments_df.to_csv(segments_filepath, index=False)
     
+    # Save all segments to Parquet (WKB geometry) for fast loading in the app
+    print(f"Saving all road segments to {segments_parquet_filepath}...")
+    segments_df.to_parquet(segments_parquet_filepath, index=False)
+    
     # Display sample data
     print("\nSample road segments:")
     sample_columns = ["name", "start_lat", "start_lon", "end_lat", "end_lon", "length"]
@@ -79,7 +122,7 @@ try:
     
     elapsed_time = time.time() - start_time
     print(f"\nExtracted {len(segments_df)} total road segments ({len(named_segments_df)} named).")
-    print(f"Data saved to {segments_filepath} and {named_segments_filepath}")
+    print(f"Data saved to {segments_filepath}, {segments_parquet_filepath} and {named_segments_filepath}")
     print(f"Processing completed in {elapsed_time:.2f} seconds.")
     
 except Exception as e:
@@ -1,13 +1,23 @@
 import osmnx as ox
+import geopandas as gpd
 import os
 import matplotlib.pyplot as plt
 
 # Define file paths for saving/loading data
 graph_filepath = 'warsaw_graph.graphml'
+nodes_filepath = 'warsaw_nodes.parquet'
+edges_filepath = 'warsaw_edges.parquet'
 image_filepath = 'warsaw_map.png'
 
-# Check if the saved graph exists
-if os.path.exists(graph_filepath):
+# Prefer the nodes/edges Parquet files written by extract_segments.py (unless the saved graph is newer), then the saved graph
+parquet_is_current = os.path.exists(nodes_filepath) and os.path.exists(edges_filepath) and (
+    not os.path.exists(graph_filepath)
+    or min(os.path.getmtime(nodes_filepath), os.path.getmtime(edges_filepath)) >= os.path.getmtime(graph_filepath)
+)
+if parquet_is_current:
+    print(f"Loading graph from {nodes_filepath} and {edges_filepath}...")
+    G = ox.graph_from_gdfs(gpd.read_parquet(nodes_filepath), gpd.read_parquet(edges_filepath))
+elif os.path.exists(graph_filepath):
     print(f"Loading graph from {graph_filepath}...")
     G = ox.load_graphml(graph_filepath)
 else:
@@ -1,53 +1,41 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 
 # Load road segments
-segments_df = pd.read_csv("warsaw_road_segments.csv")
-
-# Define 24 hours
-hours = [f"{h:02d}:00" for h in range(24)]
-
-def simulate_speed(hour):
-    """Return simulated speed (km/h) based on time of day."""
-    h = int(hour.split(":")[0])
-    if 7 <= h <= 9 or 16 <= h <= 18:
-        return np.random.normal(18, 5)  # Rush hour
-    elif 10 <= h <= 15:
-        return np.random.normal(30, 7)
-    elif 19 <= h <= 22:
-        return np.random.normal(40, 5)
-    else:
-        return np.random.normal(50, 5)  # Night
-
-# Create traffic data per road segment per hour
-traffic_data = []
-
-print(f"Generating traffic data for {len(segments_df)} road segments across 24 hours...")
-
-for idx, row in segments_df.iterrows():
-    segment_id = row["segment_id"]
-    road_name = row["name"] if pd.notna(row["name"]) else "Unnamed Road"
-    
-    for hour in hours:
-        speed = max(5, simulate_speed(hour))  # Avoid negative/very low speeds
-        traffic_data.append({
-            "segment_id": segment_id,
-            "road_name": road_name,
-            "hour": hour,
-            "speed_kph": round(speed, 1)
-        })
-    
-    # Print progress every 1000 segments
-    if idx % 1000 == 0 and idx > 0:
-        print(f"Processed {idx}/{len(segments_df)} segments...")
-
-# Save to CSV
-traffic_df = pd.DataFrame(traffic_data)
-traffic_df.to_csv("simulated_traffic.csv", index=False)
+segments_df = pd.read_csv("warsaw_road_segments.csv", engine="pyarrow", usecols=["segment_id", "name"], dtype={"segment_id": "string[pyarrow]", "name": "string[pyarrow]"})
+
+# Define 24 hours (stored as int8 hour of day, formatted as HH:00 only for display)
+hour_values = np.arange(24, dtype=np.int8)
+
+# Speed profile (mean, std in km/h) per hour of day
+rush_hour = ((hour_values >= 7) & (hour_values <= 9)) | ((hour_values >= 16) & (hour_values <= 18))
+midday = (hour_values >= 10) & (hour_values <= 15)
+evening = (hour_values >= 19) & (hour_values <= 22)
+hour_means = np.select([rush_hour, midday, evening], [18, 30, 40], default=50)  # Default: night
+hour_stds = np.select([rush_hour, midday, evening], [5, 7, 5], default=5)
+
+num_segments = len(segments_df)
+print(f"Generating traffic data for {num_segments} road segments across 24 hours...")
+
+# Draw the whole (segments x hours) speed matrix at once
+rng = np.random.default_rng(42)
+speeds = rng.normal(hour_means, hour_stds, size=(num_segments, len(hour_values)))
+speeds = np.maximum(speeds, 5).round(1).astype(np.float32)  # Avoid negative/very low speeds; float32 is plenty for 0.1 km/h
+
+# Build the long-format table: one row per segment per hour
+road_names = segments_df["name"].fillna("Unnamed Road").to_numpy()
+traffic_df = pd.DataFrame({
+    "segment_id": np.repeat(segments_df["segment_id"].to_numpy(), len(hour_values)),
+    "road_name": np.repeat(road_names, len(hour_values)),
+    "hour": np.tile(hour_values, num_segments),
+    "speed_kph": speeds.ravel()
+})
+
+# Save to Parquet (typed, compressed columnar storage)
+traffic_df.to_parquet("simulated_traffic.parquet", index=False, compression="zstd")
 
 print("\nData sample:")
 print(traffic_df.head(10))
 
 print(f"\n✅ Simulated traffic data for {len(traffic_df)} entries.")
-print(f"Data saved to simulated_traffic.csv")
+print(f"Data saved to simulated_traffic.parquet")